@@ -0,0 +1,108 @@
+import os
+import time
+import hashlib
+import sqlite3
+import numpy as np
+
+# --- Config ---
+# Committed alongside trends.json/draft.json: each workflow run starts from a fresh checkout,
+# so the repo is the only place the cache survives between runs. Expired rows are purged on write
+# to keep the file small.
+CACHE_DB = "llm_cache.db"
+CACHE_TTL = 7 * 24 * 3600  # seconds
+CACHE_MAX_ENTRIES = 1000
+SIMILARITY_THRESHOLD = 0.92
+CACHE_BYPASS = os.environ.get("LLM_CACHE_BYPASS") == "1"
+
+def _connect():
+    conn = sqlite3.connect(CACHE_DB)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS responses ("
+        "key TEXT PRIMARY KEY, response TEXT, created REAL, last_used REAL)"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS semantic ("
+        "title TEXT PRIMARY KEY, embedding BLOB, response TEXT, created REAL)"
+    )
+    return conn
+
+def cache_key(model_name, prompt, temperature=None):
+    """SHA-256 over everything that changes the model output."""
+    return hashlib.sha256(f"{model_name}|{temperature}|{prompt}".encode()).hexdigest()
+
+def cache_get(key):
+    """Return the cached raw response for key, or None on miss/expiry."""
+    if CACHE_BYPASS: return None
+    try:
+        with _connect() as conn:
+            row = conn.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if not row: return None
+            if time.time() - row[1] > CACHE_TTL:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+    except sqlite3.Error as e:
+        print(f"Cache Error: {e}")
+        return None
+
+def cache_set(key, response):
+    """Store a raw response and evict least-recently-used rows beyond CACHE_MAX_ENTRIES."""
+    if CACHE_BYPASS: return
+    now = time.time()
+    try:
+        with _connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)", (key, response, now, now))
+            conn.execute("DELETE FROM responses WHERE created < ?", (now - CACHE_TTL,))
+            conn.execute(
+                "DELETE FROM responses WHERE key NOT IN "
+                "(SELECT key FROM responses ORDER BY last_used DESC LIMIT ?)",
+                (CACHE_MAX_ENTRIES,)
+            )
+    except sqlite3.Error as e:
+        print(f"Cache Error: {e}")
+
+def semantic_get(embedding, threshold=SIMILARITY_THRESHOLD):
+    """Return the response of the most similar stored title if its cosine similarity clears threshold."""
+    if CACHE_BYPASS or embedding is None: return None
+    try:
+        with _connect() as conn:
+            rows = conn.execute("SELECT embedding, response FROM semantic WHERE created > ?",
+                                (time.time() - CACHE_TTL,)).fetchall()
+    except sqlite3.Error as e:
+        print(f"Cache Error: {e}")
+        return None
+    if not rows: return None
+
+    # Mismatched dimensions (e.g. after an EMBED_MODEL change) are a miss, not a drafting failure
+    try:
+        query = np.asarray(embedding, dtype=np.float32)
+        matrix = np.stack([np.frombuffer(r[0], dtype=np.float32) for r in rows])
+        scores = matrix @ query / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query))
+        best = int(np.argmax(scores))
+    except ValueError as e:
+        print(f"Cache Error: {e}")
+        return None
+    return rows[best][1] if scores[best] >= threshold else None
+
+def semantic_set(title, embedding, response, replaces=None):
+    """Remember a response under its title embedding for near-duplicate lookups.
+
+    replaces drops every row still holding that (rejected) response, whichever title it was stored under.
+    """
+    if CACHE_BYPASS or embedding is None: return
+    blob = np.asarray(embedding, dtype=np.float32).tobytes()
+    now = time.time()
+    try:
+        with _connect() as conn:
+            if replaces is not None:
+                conn.execute("DELETE FROM semantic WHERE response = ?", (replaces,))
+            conn.execute("INSERT OR REPLACE INTO semantic VALUES (?, ?, ?, ?)", (title, blob, response, now))
+            conn.execute("DELETE FROM semantic WHERE created < ?", (now - CACHE_TTL,))
+            conn.execute(
+                "DELETE FROM semantic WHERE title NOT IN "
+                "(SELECT title FROM semantic ORDER BY created DESC LIMIT ?)",
+                (CACHE_MAX_ENTRIES,)
+            )
+    except sqlite3.Error as e:
+        print(f"Cache Error: {e}")
@@ -1,11 +1,29 @@
 import os
+import io
 import json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+import asyncio
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import httpx
 import google.generativeai as genai
-import xml.etree.ElementTree as ET
+from google.api_core import exceptions as google_exceptions
+from lxml import etree
 from datetime import datetime
 import subprocess
+import threading
+import shlex
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 import re
+import textwrap
+import functools
+import urllib.parse
+from llm_cache import cache_key, cache_get, cache_set, semantic_get, semantic_set
 
 # --- Config ---
 TELEGRAM_TOKEN = os.environ["TELEGRAM_TOKEN"]
@@ -24,11 +42,124 @@ AUTHOR_TITLE = "Senior Frontend Engineer"
 
 # Paths
 TRENDS_FILE = "trends.json"
+FEED_CACHE_FILE = "feed_cache.json"
+TG_OFFSET_FILE = ".tg_offset"
 DRAFT_FILE = "draft.json"
 REVIEW_DOC = "review_copy.md"
+PREFETCH_IMAGE = "draft_cover.jpg.cache"  # only one draft is ever pending, so one slot
 CONTENT_DIR = "src/content/blog"
 ASSETS_DIR = "src/assets"
 
+# Sources
+FEED_URL = "https://dev.to/feed/tag/react"
+
+# Gemini
+GEMINI_MODEL = "gemini-2.5-flash"
+EMBED_MODEL = "models/text-embedding-004"
+
+# Fail fast instead of stalling the runner: (connect, read) seconds for HTTP, total seconds for Gemini
+HTTP_TIMEOUT = (5, 30)
+GEMINI_TIMEOUT = 60
+
+# Shared HTTP session: keep-alive reuse per host, retry with backoff on flaky endpoints.
+# Retry's default allowed_methods leaves POSTs to connect-level retries, so nothing gets published twice.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4, pool_maxsize=16,
+    max_retries=Retry(total=3, connect=3, read=2, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+))
+
+# Pre-compiled patterns
+_NONWORD_RE = re.compile(r'[^\w\s]')
+_MD_STRIP_RE = re.compile(r'[#*`\[\]]')
+# Section markers are uppercase names, so JS `===` inside code samples never matches
+_SECTION_RE = re.compile(r'===([A-Z_]+)===')
+
+# ASCII fast path for get_slug: every non-alphanumeric char becomes "-"
+_SLUG_TABLE = str.maketrans({chr(cp): "-" for cp in range(0x80) if not chr(cp).isalnum()})
+
+# Draft prompt, split around the topic title so each draft is a single concatenation
+_PROMPT_PREFIX = """
+        Topic: \""""
+_PROMPT_SUFFIX = """\"
+        Audience: Professional developers and engineering teams.
+        
+        WRITING STYLE (CRITICAL):
+        Write in a clear, professional, and genuinely HUMAN tone.
+        The style should feel natural — like an experienced developer explaining 
+        the topic with confidence and warmth to a colleague over coffee.
+        
+        - Use smooth transitions and conversational flow
+        - Include relatable examples and small storytelling touches
+        - Show real understanding, not robotic repetition
+        - Make it exciting, practical, and rich with real-world insights
+        - Avoid stiff, mechanical, or AI-sounding wording
+        - Write as a thoughtful expert who knows how to teach and simplify
+        - Keep the reader engaged from start to finish
+        - Use "I've found...", "In my experience...", "Here's the thing..."
+        - Share lessons learned from real projects
+        
+        Generate 5 parts. Use STRICT separators.
+        
+        0. PRIMARY_TECH (IMPORTANT - single word):
+           - Identify the MAIN technology/framework from the topic
+           - Examples: "React", "NextJS", "TypeScript", "TailwindCSS", "NodeJS", "GraphQL", "Redux", "Vite"
+           - Just output the single tech name, nothing else
+        
+        1. VIDEO SCRIPT (200 words):
+           - Warm, confident narrator voice — like explaining to a friend
+           - Start with a hook that makes them curious
+           - Share a quick story or "aha moment" from real experience
+           - End with actionable takeaway
+        
+        2. VISUAL PROMPT (for image generation):
+           - MUST represent the specific technology/concept from the topic
+           - Dark background (#1A1A1A) with gold accents (#C9A227)
+           - Include visual elements that symbolize the PRIMARY_TECH:
+             * React: atomic structures, orbital rings, component trees
+             * Next.js: flowing routes, server/client split visuals, N-shaped patterns
+             * TypeScript: type annotations, structured blocks, blue accents
+             * CSS/Tailwind: layered styling sheets, color palettes, responsive grids
+             * State Management: interconnected nodes, data flow arrows
+             * Performance: speedometer, lightning bolts, optimization graphs
+           - Include abstract representations of the TOPIC concept (hooks, components, routing, etc.)
+           - Minimalist but MEANINGFUL - the image should tell what the article is about
+           - NO text, NO logos, but recognizable tech symbolism
+           - Professional, elegant, developer-focused aesthetic
+        
+        3. BLOG POST (Markdown, 800-1200 words):
+           - Hook: Start with a relatable problem or story
+           - Context: Why this matters in real projects
+           - Deep Dive: Explain with practical code (React/TypeScript)
+           - Insights: Share what most tutorials miss
+           - Pitfalls: Common mistakes and how to avoid them
+           - Wrap-up: Key takeaways, not a boring summary
+           - NO quizzes, NO "In conclusion...", NO robotic endings
+           - IMPORTANT: Write raw markdown, do NOT wrap in ```markdown``` code fences
+           - Only use code fences for actual code examples (```typescript, ```bash, etc.)
+        
+        4. TWEETS (5-7 tweets):
+           - Expert thread style (like Dan Abramov or Kent C. Dodds)
+           - Punchy, insightful, opinionated
+           - Each tweet should stand alone but flow together
+           - End with a thought-provoking question or bold statement
+        
+        OUTPUT FORMAT:
+        ===PRIMARY_TECH===
+        (Single word: React, NextJS, TypeScript, etc.)
+        ===SCRIPT===
+        (Text)
+        ===PROMPT===
+        (Text - detailed visual description representing the tech and topic)
+        ===BLOG===
+        (Text)
+        ===TWEETS===
+        (Text)
+        """
+
+# Shared style prefix for every generated cover
+IMAGE_BASE_STYLE = "dark background black gold accent minimalist abstract professional elegant"
+
 # Tech-to-visual mapping for image generation
 TECH_VISUALS = {
     "react": "atomic orbital rings component tree blue cyan",
@@ -50,28 +181,42 @@ TECH_VISUALS = {
     "performance": "speedometer lightning optimization rocket"
 }
 
+_TECH_KEY_STRIP = str.maketrans("", "", " .-")
+
+@functools.lru_cache(maxsize=64)
 def get_tech_style(primary_tech):
     """Get visual keywords for a given technology."""
-    tech_key = primary_tech.lower().replace(" ", "").replace(".", "").replace("-", "")
+    tech_key = primary_tech.lower().translate(_TECH_KEY_STRIP)
     return TECH_VISUALS.get(tech_key, "code symbols programming developer")
 
 def build_image_url(primary_tech, title, img_prompt):
     """Build a tech-specific image URL for Pollinations."""
-    clean_prompt = re.sub(r'[^\w\s]', '', img_prompt)[:100]
-    tech_style = get_tech_style(primary_tech)
-    base_style = "dark%20background%20black%20gold%20accent%20minimalist%20abstract%20professional%20elegant"
-    tech_keywords = tech_style.replace(' ', '%20')
-    topic_words = re.sub(r'[^\w\s]', '', title)[:40].replace(' ', '%20')
-    return f"https://image.pollinations.ai/prompt/{base_style}%20{tech_keywords}%20{topic_words}%20{clean_prompt.replace(' ', '%20')}?width=1200&height=630"
+    clean_prompt = _NONWORD_RE.sub('', img_prompt)[:100]
+    topic_words = _NONWORD_RE.sub('', title)[:40]
+    parts = [IMAGE_BASE_STYLE, get_tech_style(primary_tech), topic_words, clean_prompt]
+    # Path segment, so spaces must be %20 (quote_plus would turn them into literal "+")
+    encoded = urllib.parse.quote(" ".join(parts), safe='')
+    return f"https://image.pollinations.ai/prompt/{encoded}?width=1200&height=630"
 
 # --- Helpers ---
+def embed_title(title):
+    """Embedding for semantic draft lookups; None if the embed call fails."""
+    try:
+        return genai.embed_content(model=EMBED_MODEL, content=title, request_options={"timeout": GEMINI_TIMEOUT})["embedding"]
+    except Exception as e:
+        print(f"Embedding Error: {e}")
+        return None
+
 def run_git_commands(commit_msg):
+    # One shell, one chain: identity is passed per-commit instead of via two `git config --global` spawns
+    script = (
+        "git add . && "
+        "git -c user.name=github-actions -c user.email=actions@github.com "
+        f"commit -m {shlex.quote(commit_msg)} && "
+        "git push"
+    )
     try:
-        subprocess.run(["git", "config", "--global", "user.name", "github-actions"])
-        subprocess.run(["git", "config", "--global", "user.email", "actions@github.com"])
-        subprocess.run(["git", "add", "."])
-        subprocess.run(["git", "commit", "-m", commit_msg])
-        subprocess.run(["git", "push"])
+        subprocess.run(["bash", "-c", script], check=False)
     except Exception as e:
         print(f"Git Error: {e}")
 
@@ -89,7 +234,7 @@ def trigger_deploy():
         }
         data = {"ref": "main"}
         
-        response = requests.post(url, headers=headers, json=data)
+        response = _SESSION.post(url, headers=headers, json=data, timeout=HTTP_TIMEOUT)
         
         if response.status_code == 204:
             print("Deploy workflow triggered successfully")
@@ -101,47 +246,115 @@ def trigger_deploy():
         print(f"Deploy trigger error: {e}")
         return False
 
+def _markdown_then_plain(data):
+    """Payloads to try in order: Markdown first, then plain text if Telegram rejects the entities."""
+    return (dict(data, parse_mode="Markdown"), data)
+
+async def _send_chunks_async(url, chunks):
+    """POST all message chunks concurrently over one HTTP/2 connection."""
+    async def post_chunk(client, text):
+        for payload in _markdown_then_plain({"chat_id": CHAT_ID, "text": text}):
+            resp = await client.post(url, data=payload)
+            if resp.status_code != 400: break
+        if not resp.json().get("ok"): print(f"Telegram Error: {resp.text}")
+
+    async with httpx.AsyncClient(http2=True, timeout=httpx.Timeout(HTTP_TIMEOUT[1], connect=HTTP_TIMEOUT[0])) as client:
+        await asyncio.gather(*[
+            post_chunk(client, f"[{i}/{len(chunks)}] {chunk}")
+            for i, chunk in enumerate(chunks, 1)
+        ])
+
+def _telegram_post(url, data, files=None):
+    """POST to the Bot API; a 400 (usually a stray _ or * in LLM text) is resent without parse_mode."""
+    for payload in _markdown_then_plain(data):
+        for f in (files or {}).values(): f.seek(0)
+        resp = _SESSION.post(url, data=payload, files=files, timeout=HTTP_TIMEOUT)
+        if resp.status_code != 400: break
+    if not resp.json().get("ok"): print(f"Telegram Error: {resp.text}")
+
 def send_telegram(text, img_path=None, doc_path=None):
     base_url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}"
     try:
         if doc_path:
             with open(doc_path, 'rb') as doc:
-                requests.post(f"{base_url}/sendDocument",
-                              data={"chat_id": CHAT_ID, "caption": text[:1000], "parse_mode": "Markdown"},
-                              files={"document": doc})
+                _telegram_post(f"{base_url}/sendDocument", {"chat_id": CHAT_ID, "caption": text[:1000]}, files={"document": doc})
         elif img_path:
             with open(img_path, 'rb') as photo:
-                requests.post(f"{base_url}/sendPhoto", 
-                              data={"chat_id": CHAT_ID, "caption": text[:1000], "parse_mode": "Markdown"}, 
-                              files={"photo": photo})
+                _telegram_post(f"{base_url}/sendPhoto", {"chat_id": CHAT_ID, "caption": text[:1000]}, files={"photo": photo})
         else:
             if len(text) > 4000:
-                for x in range(0, len(text), 4000):
-                    requests.post(f"{base_url}/sendMessage", 
-                                  data={"chat_id": CHAT_ID, "text": text[x:x+4000], "parse_mode": "Markdown"})
+                # Chunks may land out of order, hence the [i/n] prefix
+                chunks = [text[x:x+4000] for x in range(0, len(text), 4000)]
+                asyncio.run(_send_chunks_async(f"{base_url}/sendMessage", chunks))
             else:
-                requests.post(f"{base_url}/sendMessage", 
-                              data={"chat_id": CHAT_ID, "text": text, "parse_mode": "Markdown"})
+                _telegram_post(f"{base_url}/sendMessage", {"chat_id": CHAT_ID, "text": text})
     except Exception as e:
         print(f"Telegram Error: {e}")
 
+def jload(path):
+    """Read a JSON state file, using orjson when it is installed."""
+    with open(path, 'rb') as f: data = f.read()
+    return orjson.loads(data) if orjson else json.loads(data)
+
+def jdump(path, obj):
+    """Write a JSON state file as indented UTF-8, using orjson when it is installed."""
+    if orjson: data = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    else: data = json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    with open(path, 'wb') as f: f.write(data)
+
+def get_latest_reply():
+    """Text of the newest Telegram message since the last processed update, or None."""
+    offset = 0
+    if os.path.exists(TG_OFFSET_FILE):
+        with open(TG_OFFSET_FILE, 'r') as f: offset = int(f.read().strip() or 0)
+    params = {"offset": offset + 1 if offset else 0, "timeout": 0, "allowed_updates": json.dumps(["message"])}
+    updates = _SESSION.get(f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/getUpdates", params=params, timeout=HTTP_TIMEOUT).json()
+    if not updates.get("result"): return None
+
+    # Persisted offset also acknowledges older updates, so a stale reply can't re-trigger a mode
+    latest = updates["result"][-1]
+    with open(TG_OFFSET_FILE, 'w') as f: f.write(str(latest["update_id"]))
+    return latest.get("message", {}).get("text", "").strip()
+
+def download_image(url, path):
+    """Stream an image straight to disk instead of buffering it in memory."""
+    with _SESSION.get(url, stream=True, timeout=HTTP_TIMEOUT) as r:
+        r.raise_for_status()
+        r.raw.decode_content = True
+        with open(path, 'wb') as f: shutil.copyfileobj(r.raw, f, length=65536)
+
+def prefetch_image(url, path):
+    """Download the cover at draft time so publish only has to move it into place."""
+    try:
+        download_image(url, path)
+    except Exception as e:
+        print(f"Image prefetch failed: {e}")
+        if os.path.exists(path): os.remove(path)
+
+def extract_sections(raw):
+    """Split the model output on its ===NAME=== markers in one pass."""
+    parts = _SECTION_RE.split(raw)
+    return {name: body.strip() for name, body in zip(parts[1::2], parts[2::2])}
+
 def get_slug(title):
-    return "".join([c if c.isalnum() else "-" for c in title])[:50].lower()
+    title = title[:50]
+    if title.isascii(): return title.translate(_SLUG_TABLE).lower()
+    return "".join([c if c.isalnum() else "-" for c in title]).lower()
 
 # --- LOGIC 1: DRAFTING ---
 def run_draft_mode(is_retry=False):
-    updates = requests.get(f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/getUpdates").json()
-    if not updates.get("result"): return
-    last_text = updates["result"][-1]["message"].get("text", "").strip()
-
-    if not is_retry and not last_text.isdigit(): return
-    idx = int(last_text) - 1 if last_text.isdigit() else 0
+    # A retry comes from publish mode, which has already consumed the "2" reply
+    idx = 0
+    if not is_retry:
+        last_text = get_latest_reply()
+        if not last_text or not last_text.isdigit(): return
+        idx = int(last_text) - 1
     
     if not os.path.exists(TRENDS_FILE): return
-    with open(TRENDS_FILE, 'r') as f: trends = json.load(f)
+    trends = jload(TRENDS_FILE)
     
     if is_retry and os.path.exists(DRAFT_FILE):
-        with open(DRAFT_FILE, 'r') as f: old = json.load(f)
+        old = jload(DRAFT_FILE)
         topic = {"title": old['title'], "link": old.get('link', '')}
     elif 0 <= idx < len(trends):
         topic = trends[idx]
@@ -152,108 +365,56 @@ def run_draft_mode(is_retry=False):
 
     try:
         genai.configure(api_key=GEMINI_KEY)
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        
-        prompt = f"""
-        Topic: "{topic['title']}"
-        Audience: Professional developers and engineering teams.
-        
-        WRITING STYLE (CRITICAL):
-        Write in a clear, professional, and genuinely HUMAN tone.
-        The style should feel natural — like an experienced developer explaining 
-        the topic with confidence and warmth to a colleague over coffee.
-        
-        - Use smooth transitions and conversational flow
-        - Include relatable examples and small storytelling touches
-        - Show real understanding, not robotic repetition
-        - Make it exciting, practical, and rich with real-world insights
-        - Avoid stiff, mechanical, or AI-sounding wording
-        - Write as a thoughtful expert who knows how to teach and simplify
-        - Keep the reader engaged from start to finish
-        - Use "I've found...", "In my experience...", "Here's the thing..."
-        - Share lessons learned from real projects
-        
-        Generate 5 parts. Use STRICT separators.
-        
-        0. PRIMARY_TECH (IMPORTANT - single word):
-           - Identify the MAIN technology/framework from the topic
-           - Examples: "React", "NextJS", "TypeScript", "TailwindCSS", "NodeJS", "GraphQL", "Redux", "Vite"
-           - Just output the single tech name, nothing else
-        
-        1. VIDEO SCRIPT (200 words):
-           - Warm, confident narrator voice — like explaining to a friend
-           - Start with a hook that makes them curious
-           - Share a quick story or "aha moment" from real experience
-           - End with actionable takeaway
-        
-        2. VISUAL PROMPT (for image generation):
-           - MUST represent the specific technology/concept from the topic
-           - Dark background (#1A1A1A) with gold accents (#C9A227)
-           - Include visual elements that symbolize the PRIMARY_TECH:
-             * React: atomic structures, orbital rings, component trees
-             * Next.js: flowing routes, server/client split visuals, N-shaped patterns
-             * TypeScript: type annotations, structured blocks, blue accents
-             * CSS/Tailwind: layered styling sheets, color palettes, responsive grids
-             * State Management: interconnected nodes, data flow arrows
-             * Performance: speedometer, lightning bolts, optimization graphs
-           - Include abstract representations of the TOPIC concept (hooks, components, routing, etc.)
-           - Minimalist but MEANINGFUL - the image should tell what the article is about
-           - NO text, NO logos, but recognizable tech symbolism
-           - Professional, elegant, developer-focused aesthetic
-        
-        3. BLOG POST (Markdown, 800-1200 words):
-           - Hook: Start with a relatable problem or story
-           - Context: Why this matters in real projects
-           - Deep Dive: Explain with practical code (React/TypeScript)
-           - Insights: Share what most tutorials miss
-           - Pitfalls: Common mistakes and how to avoid them
-           - Wrap-up: Key takeaways, not a boring summary
-           - NO quizzes, NO "In conclusion...", NO robotic endings
-           - IMPORTANT: Write raw markdown, do NOT wrap in ```markdown``` code fences
-           - Only use code fences for actual code examples (```typescript, ```bash, etc.)
+        model = genai.GenerativeModel(GEMINI_MODEL)
         
-        4. TWEETS (5-7 tweets):
-           - Expert thread style (like Dan Abramov or Kent C. Dodds)
-           - Punchy, insightful, opinionated
-           - Each tweet should stand alone but flow together
-           - End with a thought-provoking question or bold statement
-        
-        OUTPUT FORMAT:
-        ===PRIMARY_TECH===
-        (Single word: React, NextJS, TypeScript, etc.)
-        ===SCRIPT===
-        (Text)
-        ===PROMPT===
-        (Text - detailed visual description representing the tech and topic)
-        ===BLOG===
-        (Text)
-        ===TWEETS===
-        (Text)
-        """
+        prompt = _PROMPT_PREFIX + topic['title'] + _PROMPT_SUFFIX
         
-        response = model.generate_content(prompt)
-        raw = response.text
+        # Regenerate asks for a fresh take, so it skips the lookup but still refreshes the entry
+        key = cache_key(GEMINI_MODEL, prompt)
+        raw = None if is_retry else cache_get(key)
+        rejected = cache_get(key) if is_retry else None
+        # Embedded on retry too, so the regenerated draft replaces the rejected one in the semantic cache
+        embedding = embed_title(topic['title']) if raw is None else None
+        if raw is None and not is_retry:
+            # Near-duplicate trend titles reuse the earlier draft and get promoted into the exact-match cache
+            raw = semantic_get(embedding)
+            if raw is not None: cache_set(key, raw)
+        prefetch = None
+        if raw is None:
+            # Stream so the user hears back and the cover starts downloading before the blog is finished
+            raw, blog_started = "", False
+            for chunk in model.generate_content(prompt, stream=True, request_options={"timeout": GEMINI_TIMEOUT}):
+                # Trailing chunks can carry only the finish reason/usage, and .text raises on those
+                if not chunk.parts: continue
+                raw += chunk.text
+                if not blog_started and "===BLOG===" in raw:
+                    blog_started = True
+                    early = extract_sections(raw)
+                    early_img_url = build_image_url(early.get("PRIMARY_TECH", "Missing"), topic['title'], early.get("PROMPT", "Missing"))
+                    prefetch = threading.Thread(target=prefetch_image, args=(early_img_url, PREFETCH_IMAGE), daemon=True)
+                    prefetch.start()
+                    send_telegram("⏳ Writing blog section...")
+            if not raw: raise ValueError("Gemini returned no text (response blocked or empty)")
+            cache_set(key, raw)
+            semantic_set(topic['title'], embedding, raw, replaces=rejected)
         
-        def extract(t, s, e):
-            p = f"{s}(.*?){e}" if e else f"{s}(.*)"
-            m = re.search(p, t, re.DOTALL)
-            return m.group(1).strip() if m else "Missing"
-
-        primary_tech = extract(raw, "===PRIMARY_TECH===", "===SCRIPT===")
-        script = extract(raw, "===SCRIPT===", "===PROMPT===")
-        prompt_txt = extract(raw, "===PROMPT===", "===BLOG===")
-        blog = extract(raw, "===BLOG===", "===TWEETS===")
-        tweets = extract(raw, "===TWEETS===", None)
+        sections = extract_sections(raw)
+        primary_tech = sections.get("PRIMARY_TECH", "Missing")
+        script = sections.get("SCRIPT", "Missing")
+        prompt_txt = sections.get("PROMPT", "Missing")
+        blog = sections.get("BLOG", "Missing")
+        tweets = sections.get("TWEETS", "Missing")
         
         # Save Draft with primary_tech
         draft_data = {
             "title": topic['title'], "link": topic['link'],
             "primary_tech": primary_tech,
             "script": script, "img_prompt": prompt_txt,
-            "blog": blog, "tweets": tweets
+            "blog": blog, "tweets": tweets,
+            "prefetched_image": PREFETCH_IMAGE
         }
         
-        with open(DRAFT_FILE, 'w', encoding='utf-8') as f: json.dump(draft_data, f, indent=2)
+        jdump(DRAFT_FILE, draft_data)
         
         # Create Review Doc
         review_content = f"# REVIEW: {topic['title']}\n\n**Primary Tech:** {primary_tech}\n\n## 🎥 Video Script\n{script}\n\n## 🖼️ Image Prompt\n{prompt_txt}\n\n## 🐦 Expert Thread\n{tweets}\n\n## 📝 Blog Post\n{blog}"
@@ -261,24 +422,29 @@ def run_draft_mode(is_retry=False):
         
         # Generate Temp Image for Review (tech-specific + dark/gold theme)
         temp_img_url = build_image_url(primary_tech, topic['title'], prompt_txt)
+        if prefetch is None:
+            prefetch = threading.Thread(target=prefetch_image, args=(temp_img_url, PREFETCH_IMAGE), daemon=True)
+            prefetch.start()
         
-        # Send to Telegram
-        send_telegram(f"🖼️ **Proposed Cover:** {temp_img_url}")
-        send_telegram(f"✅ **Draft Ready!**\nAttached FULL content.\n\n👇 **Reply:**\n1️⃣ Publish\n2️⃣ Regenerate\n3️⃣ Cancel", doc_path=REVIEW_DOC)
+        # Send to Telegram (cover link rides in the document caption)
+        send_telegram(f"✅ **Draft Ready!**\nAttached FULL content.\n\n🖼️ **Proposed Cover:** {temp_img_url}\n\n👇 **Reply:**\n1️⃣ Publish\n2️⃣ Regenerate\n3️⃣ Cancel", doc_path=REVIEW_DOC)
         
+        # The prefetched cover has to be in the commit, publish runs in a fresh checkout
+        prefetch.join()
         run_git_commands(f"Draft generated: {topic['title']}")
 
+    except google_exceptions.DeadlineExceeded:
+        send_telegram(f"⌛ Gemini didn't answer within {GEMINI_TIMEOUT}s, please try again.")
     except Exception as e:
         send_telegram(f"❌ Drafting Error: {e}")
 
 # --- LOGIC 2: PUBLISHING ---
 def run_publish_mode():
     if not os.path.exists(DRAFT_FILE): return
-    updates = requests.get(f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/getUpdates").json()
-    if not updates.get("result"): return
-    last_text = updates["result"][-1]["message"].get("text", "").strip()
+    last_text = get_latest_reply()
+    if not last_text: return
 
-    with open(DRAFT_FILE, 'r') as f: draft = json.load(f)
+    draft = jload(DRAFT_FILE)
 
     if last_text == "1":
         send_telegram("🚀 Approved! Publishing...")
@@ -291,31 +457,53 @@ def run_publish_mode():
         image_filename = f"{slug}.jpg"
         local_image_path = os.path.join(ASSETS_DIR, image_filename)
         
-        # 2. Download & Save Image Locally (tech-specific + dark/gold theme)
-        try:
-            primary_tech = draft.get('primary_tech', 'React')  # Fallback for older drafts
-            img_url = build_image_url(primary_tech, draft['title'], draft['img_prompt'])
-            img_data = requests.get(img_url).content
-            with open(local_image_path, 'wb') as f: f.write(img_data)
-        except Exception as e:
-            send_telegram(f"⚠️ Image download failed: {e}")
-
-        # 3. Create Blog Post File
-        md_filename = f"{slug}.md"
-        md_path = os.path.join(CONTENT_DIR, md_filename)
-        
-        # Date Format: "Dec 12 2025"
-        formatted_date = datetime.now().strftime("%b %d %Y")
-        
-        # Extract first sentence for description
-        blog_text = draft['blog'].strip()
-        first_para = blog_text.split('\n\n')[0] if '\n\n' in blog_text else blog_text[:200]
-        description = re.sub(r'[#*`\[\]]', '', first_para)[:150].strip()
-        if not description.endswith('.'):
-            description = description.rsplit(' ', 1)[0] + '...'
-        
-        # Blog Content with Astro Frontmatter (relative path for image())
-        file_content = f"""---
+        primary_tech = draft.get('primary_tech', 'React')  # Fallback for older drafts
+        img_url = build_image_url(primary_tech, draft['title'], draft['img_prompt'])
+        my_url = f"{SITE_URL}{SITE_BASE}/blog/{slug}"
+
+        # Image download and Dev.to publish are independent, so they run while the post file is written
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            # 2. Download Image (tech-specific + dark/gold theme), unless draft mode already fetched it
+            prefetched = draft.get('prefetched_image')
+            if prefetched and os.path.exists(prefetched):
+                image_job = executor.submit(shutil.move, prefetched, local_image_path)
+            else:
+                image_job = executor.submit(download_image, img_url, local_image_path)
+
+            # 3. External Publish (Dev.to)
+            devto_job = None
+            if DEVTO_KEY:
+                url = "https://dev.to/api/articles"
+                # Uploading local images to dev.to via API is complex, usually we use a public URL.
+                # For simplicity, we use the pollination URL for Dev.to, but local path for Astro.
+                footer = (
+                    "\n\n---\n\n"
+                    "**✨ Let's keep the conversation going!**\n\n"
+                    "If you found this interesting, I'd love for you to check out more of my work or just drop in to say hello.\n\n"
+                    "✍️ **Read more on my blog:** [bishoy-bishai.github.io](https://bishoy-bishai.github.io/portfolio/blog/)  \n"
+                    "☕ **Let's chat on LinkedIn:** [linkedin.com/in/bishoybishai](https://www.linkedin.com/in/bishoybishai/)\n\n"
+                    "---"
+                )
+                data = { "article": { "title": draft['title'], "published": True, "body_markdown": draft['blog'] + footer, "main_image": img_url, "canonical_url": my_url, "tags": ["react","webdev"] } }
+                devto_job = executor.submit(_SESSION.post, url, json=data, headers={"api-key": DEVTO_KEY, "Content-Type": "application/json"}, timeout=HTTP_TIMEOUT)
+
+            # 4. Create Blog Post File
+            md_filename = f"{slug}.md"
+            md_path = os.path.join(CONTENT_DIR, md_filename)
+            
+            # Date Format: "Dec 12 2025"
+            formatted_date = datetime.now().strftime("%b %d %Y")
+            
+            # Extract first sentence for description
+            blog_text = draft['blog'].strip()
+            first_para = blog_text.split('\n\n')[0] if '\n\n' in blog_text else blog_text[:200]
+            clean = " ".join(_MD_STRIP_RE.sub('', first_para).split())
+            description = textwrap.shorten(clean, width=150, placeholder='...')
+            # shorten never splits a word, so a leading token over 147 chars (e.g. a bare URL) collapses to '...'
+            if description == '...': description = clean[:147] + '...'
+            
+            # Blog Content with Astro Frontmatter (relative path for image())
+            file_content = f"""---
 title: "{draft['title']}"
 description: "{description}"
 pubDate: "{formatted_date}"
@@ -324,38 +512,32 @@ heroImage: "../../assets/{image_filename}"
 
 {draft['blog']}
 """
-        with open(md_path, 'w', encoding='utf-8') as f: f.write(file_content)
-        
-        # 4. External Publish (Dev.to)
-        my_url = f"{SITE_URL}{SITE_BASE}/blog/{slug}"
-        if DEVTO_KEY:
-            url = "https://dev.to/api/articles"
-            # Uploading local images to dev.to via API is complex, usually we use a public URL.
-            # For simplicity, we use the pollination URL for Dev.to, but local path for Astro.
-            footer = (
-                "\n\n---\n\n"
-                "**✨ Let's keep the conversation going!**\n\n"
-                "If you found this interesting, I'd love for you to check out more of my work or just drop in to say hello.\n\n"
-                "✍️ **Read more on my blog:** [bishoy-bishai.github.io](https://bishoy-bishai.github.io/portfolio/blog/)  \n"
-                "☕ **Let's chat on LinkedIn:** [linkedin.com/in/bishoybishai](https://www.linkedin.com/in/bishoybishai/)\n\n"
-                "---"
-            )
-            data = { "article": { "title": draft['title'], "published": True, "body_markdown": draft['blog'] + footer, "main_image": img_url, "canonical_url": my_url, "tags": ["react","webdev"] } }
-            requests.post(url, json=data, headers={"api-key": DEVTO_KEY, "Content-Type": "application/json"})
-
-        # 5. Notify & Cleanup
-        send_telegram(f"📜 **Video Script:**\n\n{draft['script']}")
-        send_telegram(f"✅ **Published!**\n🌍 {my_url}")
-        
+            with open(md_path, 'w', encoding='utf-8') as f: f.write(file_content)
+
+            # Wait for the image before committing so it lands in the same push
+            try:
+                image_job.result()
+            except Exception as e:
+                send_telegram(f"⚠️ Image download failed: {e}")
+
+            if devto_job:
+                try:
+                    devto_job.result()
+                except Exception as e:
+                    send_telegram(f"⚠️ Dev.to publish failed: {e}")
+
+        # 5. Cleanup & Trigger site deployment
         os.remove(DRAFT_FILE)
         if os.path.exists(REVIEW_DOC): os.remove(REVIEW_DOC)
         run_git_commands(f"Published: {draft['title']}")
         
-        # Trigger site deployment
         if trigger_deploy():
-            send_telegram("🚀 Deploy workflow triggered!")
+            deploy_status = "🚀 Deploy workflow triggered!"
         else:
-            send_telegram("⚠️ Auto-deploy skipped. Push to main will trigger deploy.")
+            deploy_status = "⚠️ Auto-deploy skipped. Push to main will trigger deploy."
+
+        # 6. Notify once with everything
+        send_telegram(f"📜 **Video Script:**\n\n{draft['script']}\n\n✅ **Published!**\n🌍 {my_url}\n\n{deploy_status}")
 
     elif last_text == "2":
         send_telegram("🔄 Regenerating...")
@@ -363,21 +545,39 @@ heroImage: "../../assets/{image_filename}"
 
     elif last_text == "3":
         os.remove(DRAFT_FILE)
+        prefetched = draft.get('prefetched_image')
+        if prefetched and os.path.exists(prefetched): os.remove(prefetched)
         send_telegram("❌ Cancelled.")
         run_git_commands("Draft cancelled")
 
 # --- Entry Points ---
 def get_trends():
     try:
-        resp = requests.get("https://dev.to/feed/tag/react")
-        root = ET.fromstring(resp.content)
-        trends, msg = [], "☀️ **Daily Trends:**\n\n"
-        for i, item in enumerate(root.findall('.//item')[:4]):
-            trends.append({"title": item.find('title').text, "link": item.find('link').text})
-            msg += f"{i+1}️⃣ {item.find('title').text}\n"
-        with open(TRENDS_FILE, 'w') as f: json.dump(trends, f)
+        # Conditional GET: an unchanged feed comes back as an empty 304
+        headers = {}
+        if os.path.exists(TRENDS_FILE) and os.path.exists(FEED_CACHE_FILE):
+            feed_cache = jload(FEED_CACHE_FILE)
+            if feed_cache.get("etag"): headers["If-None-Match"] = feed_cache["etag"]
+            if feed_cache.get("last_modified"): headers["If-Modified-Since"] = feed_cache["last_modified"]
+        resp = _SESSION.get(FEED_URL, headers=headers, timeout=HTTP_TIMEOUT)
+
+        if resp.status_code == 304:
+            trends = jload(TRENDS_FILE)
+        else:
+            # Stream items and stop after the four we offer instead of building the whole tree
+            trends = []
+            for _, item in etree.iterparse(io.BytesIO(resp.content), tag='item'):
+                trends.append({"title": item.findtext('title'), "link": item.findtext('link')})
+                item.clear()
+                if len(trends) == 4: break
+            jdump(TRENDS_FILE, trends)
+            jdump(FEED_CACHE_FILE, {"etag": resp.headers.get("ETag"), "last_modified": resp.headers.get("Last-Modified")})
+
+        msg = "☀️ **Daily Trends:**\n\n"
+        for i, t in enumerate(trends):
+            msg += f"{i+1}️⃣ {t['title']}\n"
         send_telegram(msg + "\n👇 **Reply number to Draft.**")
-        run_git_commands("Trends")
+        if resp.status_code != 304: run_git_commands("Trends")
     except Exception as e: print(e)
 
 if __name__ == "__main__":